@@ -3,12 +3,24 @@
 
 Exposes best practices, troubleshooting guides, hardened recipes, helper
 scripts, and the annotated compose template as MCP tools. All file contents
-are read dynamically from disk — the server never needs updating when
-repository files change.
+are read from disk and cached until the file changes, so the server code never
+needs updating when repository files change. Two exceptions: the four fixed
+documents (standards, best practices, troubleshooting, template) are loaded
+once at startup (set DCFG_NO_PRELOAD=1 to read them on every call instead
+while editing them), and the list_guides/list_scripts titles are only rebuilt
+when a file is added, removed, or renamed in their directory.
 """
 
+import asyncio
+import hashlib
+import mmap
+import os
 import re
+import stat
 import sys
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from mcp.server.fastmcp import FastMCP
@@ -17,12 +29,226 @@ REPO_ROOT = Path(__file__).resolve().parent.parent
 
 mcp = FastMCP("docker-compose-field-guide")
 
+# Directories served by get_guide, get_recipe, and get_script, as strings
+# with a trailing separator for lexical containment checks.
+_DOCS_PREFIX = str((REPO_ROOT / "docs").resolve()) + os.sep
+_RECIPES_PREFIX = str((REPO_ROOT / "recipes").resolve()) + os.sep
+_SCRIPTS_PREFIX = str((REPO_ROOT / "scripts").resolve()) + os.sep
+
+# Patterns used by check_compose_text, compiled once at import. The version,
+# :latest, and 0.0.0.0 patterns only run when a literal they require is
+# present in the text.
+_RE_VERSION = re.compile(r"^version:", re.MULTILINE)
+_RE_LATEST = re.compile(r"image:\s*\S+:latest\b")
+_RE_BIND_ALL = re.compile(r'["\']?0\.0\.0\.0:')
+# Inline PASSWORD=value or password: value, sharing the literal prefix so
+# both forms are found in one scan.
+_RE_PASSWORD = re.compile(
+    r"password(?:=(?!.*_FILE)[^\$\{]\w+|:\s*['\"]?\w{4,}['\"]?)", re.IGNORECASE
+)
+
+# First "# " comment line in a script header (the shebang never matches).
+_RE_SCRIPT_DESC = re.compile(r"^\s*# (.*\S)", re.MULTILINE)
+
+# Resolved path -> (st_mtime_ns, st_size, text). Entries are revalidated
+# against a fresh stat on every read, so edits on disk are picked up.
+_FILE_CACHE: dict[Path, tuple[int, int, str]] = {}
+
+# Files larger than this are decoded straight from a read-only mmap instead
+# of being copied into a bytes object first.
+_MMAP_THRESHOLD = 64 * 1024
+
+# Directory path -> (st_mtime_ns, formatted listing). A directory's mtime
+# changes when entries are added, removed, or renamed.
+_LISTING_CACHE: dict[Path, tuple[int, str]] = {}
+
+# BLAKE2b digest of checked text -> check_compose_text report, in LRU order.
+# Keying on a digest avoids keeping large compose files alive in the cache.
+_CHECK_CACHE: OrderedDict[bytes, str] = OrderedDict()
+_CHECK_CACHE_SIZE = 128
+
+# Documents served by the four fixed tools, and their contents as loaded by
+# main(). Tools fall back to a cached disk read when a name is not preloaded.
+_STATIC_PATHS = {
+    "CLAUDE.md": REPO_ROOT / "CLAUDE.md",
+    "BEST-PRACTICES.md": REPO_ROOT / "docs" / "BEST-PRACTICES.md",
+    "TROUBLESHOOTING.md": REPO_ROOT / "docs" / "TROUBLESHOOTING.md",
+    "docker-compose.yml": REPO_ROOT / "docker-compose.yml",
+}
+_STATIC: dict[str, str] = {}
+
+
+def _read_cached(path: Path) -> str:
+    """Return the UTF-8 text of path, re-reading only when it has changed.
+
+    Raises FileNotFoundError if the file does not exist.
+    """
+    st = path.stat()
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    # FastMCP only accepts str for text content, so decode once here and
+    # serve the cached str until the file changes.
+    if st.st_size > _MMAP_THRESHOLD:
+        text = _read_mmap(path)
+    else:
+        text = path.read_bytes().decode("utf-8")
+    _FILE_CACHE[path] = (st.st_mtime_ns, st.st_size, text)
+    return text
+
+
+def _served_path(prefix: str, filename: str) -> Path | None:
+    """Return the path of filename inside the prefix directory.
+
+    Returns None if filename is not a single plain path component or
+    contains a NUL byte (which os.stat() rejects with ValueError). The
+    check is purely lexical; the served directories hold no symlinks.
+    """
+    if "/" in filename or os.sep in filename or ".." in filename or "\x00" in filename:
+        return None
+    candidate = os.path.normpath(prefix + filename)
+    if not candidate.startswith(prefix):
+        return None
+    return Path(candidate)
+
+
+def _read_mmap(path: Path) -> str:
+    """Decode path as UTF-8 directly from a read-only memory map."""
+    with path.open("rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, "utf-8")
+
+
+async def _serve_static(name: str) -> str:
+    """Return a fixed document, from the startup preload when available."""
+    text = _STATIC.get(name)
+    if text is not None:
+        return text
+    path = _STATIC_PATHS[name]
+    try:
+        return await asyncio.to_thread(_read_cached, path)
+    except FileNotFoundError:
+        return f"[file not found: {path}]"
+
+
+def _preload_static() -> None:
+    """Load every fixed document into _STATIC."""
+    for name, path in _STATIC_PATHS.items():
+        try:
+            _STATIC[name] = _read_cached(path)
+        except FileNotFoundError:
+            _STATIC[name] = f"[file not found: {path}]"
+
+
+def _read_head(path: Path, n: int = 4096) -> str:
+    """Return the first n bytes of path decoded as UTF-8, for title lookups."""
+    with path.open("rb") as fh:
+        buf = fh.read(n)
+    return buf.decode("utf-8", errors="replace")
+
+
+def _list_names(dir_path: Path, suffix: str) -> list[str]:
+    """Return the sorted names of regular files in dir_path ending in suffix."""
+    with os.scandir(dir_path) as it:
+        return sorted(
+            e.name for e in it if e.is_file(follow_symlinks=False) and e.name.endswith(suffix)
+        )
+
+
+def _md_title(name: str, head: str) -> str:
+    """Return the first-line Markdown heading of a guide, or its filename."""
+    first_line = head.split("\n", 1)[0]
+    return first_line.lstrip("# ").strip() if first_line.startswith("#") else name
+
+
+def _script_desc(name: str, head: str) -> str:
+    """Return the first "# " comment in a script header, or its filename."""
+    m = _RE_SCRIPT_DESC.search(head)
+    return m.group(1).lstrip("# ").strip() if m else name
+
+
+# Subdirectory -> (file suffix, title function, message when empty, preload
+# contents at startup) for the list_* tools. A None title function lists bare
+# filenames.
+_LISTINGS: dict[str, tuple[str, Callable[[str, str], str] | None, str, bool]] = {
+    "docs": (".md", _md_title, "[no guide files found]", False),
+    "recipes": (".yml", None, "[no recipe files found]", False),
+    "scripts": (".sh", _script_desc, "[no script files found]", True),
+}
+
+
+def _format_listing(
+    names: list[str], heads: list[str], titler: Callable[[str, str], str] | None, empty: str
+) -> str:
+    """Format a list_* result from file names and their header text."""
+    if not names:
+        return empty
+    if titler is None:
+        return "\n".join(names)
+    return "\n".join(f"{name}: {titler(name, head)}" for name, head in zip(names, heads))
+
+
+async def _list_dir(subdir: str) -> str:
+    """List the files in a repo subdirectory as configured in _LISTINGS.
+
+    The listing is cached against the directory's mtime and rebuilt only
+    when it changes. All filesystem access runs in worker threads.
+    """
+    suffix, titler, empty, _ = _LISTINGS[subdir]
+    dir_path = REPO_ROOT / subdir
+    try:
+        st = await asyncio.to_thread(dir_path.stat)
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISDIR(st.st_mode):
+        return f"[{subdir}/ directory not found]"
+    cached = _LISTING_CACHE.get(dir_path)
+    if cached is not None and cached[0] == st.st_mtime_ns:
+        return cached[1]
+    names = await asyncio.to_thread(_list_names, dir_path, suffix)
+    heads = []
+    if titler is not None:
+        heads = await asyncio.gather(
+            *(asyncio.to_thread(_read_head, dir_path / name) for name in names)
+        )
+    listing = _format_listing(names, heads, titler, empty)
+    _LISTING_CACHE[dir_path] = (st.st_mtime_ns, listing)
+    return listing
+
+
+def _warm_listings() -> None:
+    """Seed the list_* caches from a thread pool at startup.
+
+    Directories flagged in _LISTINGS also have their files loaded into
+    _FILE_CACHE. A subdirectory that cannot be read is skipped; its tool
+    builds the listing on first call instead. A file that fails to load is
+    simply read on demand later.
+    """
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for subdir, (suffix, titler, empty, preload) in _LISTINGS.items():
+            dir_path = REPO_ROOT / subdir
+            try:
+                mtime = dir_path.stat().st_mtime_ns
+                names = _list_names(dir_path, suffix)
+                paths = [dir_path / name for name in names]
+                heads = list(pool.map(_read_head, paths)) if titler is not None else []
+            except OSError:
+                continue
+            _LISTING_CACHE[dir_path] = (mtime, _format_listing(names, heads, titler, empty))
+            if preload:
+                for future in [pool.submit(_read_cached, path) for path in paths]:
+                    try:
+                        future.result()
+                    except (OSError, UnicodeDecodeError):
+                        pass
+
 
 # --- Compose standards and best practices ---
 
 
 @mcp.tool()
-def get_compose_standards() -> str:
+async def get_compose_standards() -> str:
     """Load the Docker Compose coding standards from CLAUDE.md.
 
     Returns the compose rules that every docker-compose.yml must follow:
@@ -30,14 +256,11 @@ def get_compose_standards() -> str:
     log rotation, network isolation, and the validation workflow.
     Call this before writing or reviewing any compose file.
     """
-    path = REPO_ROOT / "CLAUDE.md"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return f"[file not found: {path}]"
+    return await _serve_static("CLAUDE.md")
 
 
 @mcp.tool()
-def get_best_practices() -> str:
+async def get_best_practices() -> str:
     """Load the full best practices guide (BEST-PRACTICES.md).
 
     Covers 21 sections: image pinning, resource limits, security hardening,
@@ -45,28 +268,22 @@ def get_best_practices() -> str:
     anchors, dependency ordering, and more. Use this as the primary
     reference when building or auditing compose stacks.
     """
-    path = REPO_ROOT / "docs" / "BEST-PRACTICES.md"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return f"[file not found: {path}]"
+    return await _serve_static("BEST-PRACTICES.md")
 
 
 @mcp.tool()
-def get_troubleshooting() -> str:
+async def get_troubleshooting() -> str:
     """Load the troubleshooting and debugging playbook.
 
     Step-by-step diagnostic workflow for common Docker Compose failures:
     container won't start, unhealthy status, networking issues, volume
     permission errors, OOM kills, and more.
     """
-    path = REPO_ROOT / "docs" / "TROUBLESHOOTING.md"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return f"[file not found: {path}]"
+    return await _serve_static("TROUBLESHOOTING.md")
 
 
 @mcp.tool()
-def get_compose_template() -> str:
+async def get_compose_template() -> str:
     """Load the annotated docker-compose.yml reference template.
 
     A fully commented compose file demonstrating every best practice:
@@ -74,132 +291,100 @@ def get_compose_template() -> str:
     secrets, network isolation, and dependency ordering. Copy and adapt
     this template when starting a new stack.
     """
-    path = REPO_ROOT / "docker-compose.yml"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return f"[file not found: {path}]"
+    return await _serve_static("docker-compose.yml")
 
 
 # --- Guides ---
 
 
 @mcp.tool()
-def list_guides() -> str:
+async def list_guides() -> str:
     """List all available documentation guides.
 
     Returns the filenames and first-line titles of all Markdown files in
     the docs/ directory. Use get_guide() to retrieve a specific one.
     """
-    docs_dir = REPO_ROOT / "docs"
-    if not docs_dir.is_dir():
-        return "[docs/ directory not found]"
-    lines = []
-    for f in sorted(docs_dir.glob("*.md")):
-        first_line = f.read_text(encoding="utf-8").split("\n", 1)[0]
-        title = first_line.lstrip("# ").strip() if first_line.startswith("#") else f.name
-        lines.append(f"{f.name}: {title}")
-    if not lines:
-        return "[no guide files found]"
-    return "\n".join(lines)
+    return await _list_dir("docs")
 
 
 @mcp.tool()
-def get_guide(filename: str) -> str:
+async def get_guide(filename: str) -> str:
     """Load a specific documentation guide by filename.
 
     Args:
         filename: The guide filename (e.g. 'REVERSE-PROXY.md', 'GLOSSARY.md').
                   Use list_guides() to see available files.
     """
-    path = REPO_ROOT / "docs" / filename
-    if not path.exists():
-        return f"[guide not found: {filename}]"
     # Prevent path traversal
-    if not path.resolve().is_relative_to(REPO_ROOT / "docs"):
+    path = _served_path(_DOCS_PREFIX, filename)
+    if path is None:
         return "[invalid path]"
-    return path.read_text(encoding="utf-8")
+    try:
+        return await asyncio.to_thread(_read_cached, path)
+    except FileNotFoundError:
+        return f"[guide not found: {filename}]"
 
 
 # --- Recipes ---
 
 
 @mcp.tool()
-def list_recipes() -> str:
+async def list_recipes() -> str:
     """List available hardened Docker Compose recipes.
 
     Returns the filenames of all .yml recipe files in the recipes/
     directory. Each recipe is a production-ready compose stack for a
     popular homelab application. Use get_recipe() to retrieve one.
     """
-    recipes_dir = REPO_ROOT / "recipes"
-    if not recipes_dir.is_dir():
-        return "[recipes/ directory not found]"
-    files = sorted(f.name for f in recipes_dir.glob("*.yml"))
-    if not files:
-        return "[no recipe files found]"
-    return "\n".join(files)
+    return await _list_dir("recipes")
 
 
 @mcp.tool()
-def get_recipe(filename: str) -> str:
+async def get_recipe(filename: str) -> str:
     """Load a specific hardened Docker Compose recipe.
 
     Args:
         filename: The recipe filename (e.g. 'pihole.yml', 'nextcloud.yml').
                   Use list_recipes() to see available files.
     """
-    path = REPO_ROOT / "recipes" / filename
-    if not path.exists():
-        return f"[recipe not found: {filename}]"
-    if not path.resolve().is_relative_to(REPO_ROOT / "recipes"):
+    path = _served_path(_RECIPES_PREFIX, filename)
+    if path is None:
         return "[invalid path]"
-    return path.read_text(encoding="utf-8")
+    try:
+        return await asyncio.to_thread(_read_cached, path)
+    except FileNotFoundError:
+        return f"[recipe not found: {filename}]"
 
 
 # --- Scripts ---
 
 
 @mcp.tool()
-def list_scripts() -> str:
+async def list_scripts() -> str:
     """List available Docker helper scripts.
 
     Returns the filenames and first-line descriptions of shell scripts
     in the scripts/ directory. These cover disk reporting, cleanup,
     and safe reset operations. Use get_script() to retrieve one.
     """
-    scripts_dir = REPO_ROOT / "scripts"
-    if not scripts_dir.is_dir():
-        return "[scripts/ directory not found]"
-    lines = []
-    for f in sorted(scripts_dir.glob("*.sh")):
-        # Try to extract the description from the script header
-        content = f.read_text(encoding="utf-8")
-        desc = f.name
-        for line in content.split("\n"):
-            line = line.strip()
-            if line.startswith("# ") and not line.startswith("#!"):
-                desc = line.lstrip("# ").strip()
-                break
-        lines.append(f"{f.name}: {desc}")
-    if not lines:
-        return "[no script files found]"
-    return "\n".join(lines)
+    return await _list_dir("scripts")
 
 
 @mcp.tool()
-def get_script(filename: str) -> str:
+async def get_script(filename: str) -> str:
     """Load a specific Docker helper script.
 
     Args:
         filename: The script filename (e.g. 'safe-reset.sh', 'prune-unused.sh').
                   Use list_scripts() to see available files.
     """
-    path = REPO_ROOT / "scripts" / filename
-    if not path.exists():
-        return f"[script not found: {filename}]"
-    if not path.resolve().is_relative_to(REPO_ROOT / "scripts"):
+    path = _served_path(_SCRIPTS_PREFIX, filename)
+    if path is None:
         return "[invalid path]"
-    return path.read_text(encoding="utf-8")
+    try:
+        return await asyncio.to_thread(_read_cached, path)
+    except FileNotFoundError:
+        return f"[script not found: {filename}]"
 
 
 # --- Compose validation ---
@@ -215,22 +400,37 @@ def check_compose_text(text: str) -> str:
     Returns a list of issues found, or confirmation that the text follows
     the standards. Does not write to disk or run Docker commands.
     """
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    report = _CHECK_CACHE.get(key)
+    if report is not None:
+        _CHECK_CACHE.move_to_end(key)
+        return report
+    report = _check_compose(text)
+    _CHECK_CACHE[key] = report
+    if len(_CHECK_CACHE) > _CHECK_CACHE_SIZE:
+        _CHECK_CACHE.popitem(last=False)
+    return report
+
+
+def _check_compose(text: str) -> str:
+    """Run the check_compose_text checks on text and format the report."""
     issues = []
+    has_services = "services:" in text
 
     # Check for deprecated version key
-    if re.search(r"^version:", text, re.MULTILINE):
+    if "version:" in text and _RE_VERSION.search(text):
         issues.append("Remove the 'version:' key — it is deprecated in Compose v2")
 
     # Check for :latest tags
-    if re.search(r"image:\s*\S+:latest\b", text):
+    if ":latest" in text and _RE_LATEST.search(text):
         issues.append("Pin images to exact version tags — never use :latest")
 
-    # Check for missing restart policy
-    if "services:" in text and "restart:" not in text:
-        issues.append("Set 'restart: unless-stopped' on every service")
+    if has_services:
+        # Check for missing restart policy
+        if "restart:" not in text:
+            issues.append("Set 'restart: unless-stopped' on every service")
 
-    # Check for missing resource limits
-    if "services:" in text:
+        # Check for missing resource limits
         if "mem_limit" not in text and "memory" not in text:
             issues.append("Set mem_limit on every service to prevent OOM kills")
         if "cpus" not in text:
@@ -238,35 +438,28 @@ def check_compose_text(text: str) -> str:
         if "pids_limit" not in text:
             issues.append("Set pids_limit on every service to prevent fork bombs")
 
-    # Check for missing healthcheck
-    if "services:" in text and "healthcheck:" not in text:
-        issues.append("Add healthchecks on services with HTTP or CLI endpoints")
+        # Check for missing healthcheck
+        if "healthcheck:" not in text:
+            issues.append("Add healthchecks on services with HTTP or CLI endpoints")
 
-    # Check for missing log rotation
-    if "services:" in text and "logging:" not in text and "x-logging:" not in text:
-        issues.append("Configure log rotation (max-size: 10m, max-file: 3)")
+        # Check for missing log rotation (also matches x-logging:)
+        if "logging:" not in text:
+            issues.append("Configure log rotation (max-size: 10m, max-file: 3)")
 
-    # Check for missing security hardening
-    if "services:" in text:
+        # Check for missing security hardening
         if "cap_drop" not in text:
             issues.append("Add 'cap_drop: [ALL]' and re-add only needed capabilities")
         if "no-new-privileges" not in text:
             issues.append("Add 'security_opt: [no-new-privileges:true]'")
 
     # Check for inline passwords
-    password_patterns = [
-        r"PASSWORD=(?!.*_FILE)[^\$\{]\w+",
-        r"password:\s*['\"]?\w{4,}['\"]?",
-    ]
-    for pattern in password_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            issues.append(
-                "Avoid inline passwords — use Docker secrets with the _FILE suffix"
-            )
-            break
+    if _RE_PASSWORD.search(text):
+        issues.append(
+            "Avoid inline passwords — use Docker secrets with the _FILE suffix"
+        )
 
     # Check for 0.0.0.0 port binding
-    if re.search(r'["\']?0\.0\.0\.0:', text):
+    if "0.0.0.0:" in text and _RE_BIND_ALL.search(text):
         issues.append(
             "Avoid binding to 0.0.0.0 — use 127.0.0.1 or omit the host for LAN access"
         )
@@ -277,6 +470,9 @@ def check_compose_text(text: str) -> str:
 
 
 def main():
+    if os.environ.get("DCFG_NO_PRELOAD") != "1":
+        _preload_static()
+    _warm_listings()
     mcp.run(transport="stdio")
 
 